@@ -7,7 +7,23 @@ import json
 import os
 import re
 import random
+import mmap
+import bisect
+import bz2
+import gzip
+import lzma
+import math
+import struct
+import zlib
+import sys
+import threading
+import time
+from tkinter import filedialog
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -20,6 +36,7 @@ os.makedirs(DATA_FOLDER, exist_ok=True)
 CONFIG_FILE = os.path.join(DATA_FOLDER, "config.json")
 USER_SETTINGS_FILE = os.path.join(DATA_FOLDER, "user_settings.json")
 PHRASES_FILE = os.path.join(DATA_FOLDER, "phrases.json")
+STATS_FILE = os.path.join(DATA_FOLDER, "rule_stats.bin")
 
 
 def get_current_username():
@@ -30,6 +47,11 @@ def get_current_username():
     return "".join(c for c in username if c.isalnum() or c in "_-")
 
 
+def session_file(username):
+    """Per-user snapshot file — users sharing the data folder never see each other's dump"""
+    return os.path.join(DATA_FOLDER, f"session_{username}.bin")
+
+
 def load_phrases():
     default_phrases = [
         "Every sunrise is a new chance to chase your dreams!",
@@ -64,6 +86,32 @@ def load_phrases():
         return default_phrases
 
 
+def process_memory_mb():
+    """Resident memory of this process in MB (None if the OS won't tell)"""
+    try:
+        import platform
+        if platform.system() == "Windows":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                    (n, ctypes.c_size_t) for n in (
+                        "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                        "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                        "PagefileUsage", "PeakPagefileUsage")]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            ctypes.windll.psapi.GetProcessMemoryInfo(
+                ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+            return counters.WorkingSetSize / 1048576
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1048576
+    except:
+        return None
+
+
 def detect_system_theme():
     try:
         import platform
@@ -146,8 +194,1123 @@ def dark_messagebox(title, message):
     popup.wait_window()
 
 
+# ===================================================================
+#  ENGINE
+# ===================================================================
+RULE_PATTERN = re.compile(r'^\s*(\d+)\s*;\s*"([^"]*)"(?:\s*;\s*"([^"]*)")?(?:\s*;\s*"([^"]*)")?(?:\s*;\s*"([^"]*)")?\s*$')
+SEGMENT_SPLIT = re.compile(r'\s{2,}')
+
+
+def parse_rule(text):
+    """'12; "partial"; "prefix"; "suffix"; "type"' → (12, partial, prefix, suffix, type) or None"""
+    m = RULE_PATTERN.match(text.strip())
+    if not m:
+        return None
+    return (int(m.group(1)), m.group(2), (m.group(3) or "").strip(),
+            (m.group(4) or "").strip(), (m.group(5) or "").strip())
+
+
+def _config_entries(cfg):
+    entries = []
+    raw_entries = cfg.get("entries", []) if isinstance(cfg, dict) else cfg
+    for entry in raw_entries:
+        if isinstance(entry, str):
+            rule = parse_rule(entry)
+            if not rule:
+                continue
+        else:
+            rule = (entry.get("line", 1), entry.get("partial", ""),
+                     entry.get("prefix", ""), entry.get("suffix", ""), entry.get("type", ""))
+        if not rule[1]:
+            continue
+        entries.append(rule)
+    return entries
+
+
+def config_rules(cfg):
+    """All usable (line, partial, prefix, suffix) rules of a config (old list format included)"""
+    return [e[:4] for e in _config_entries(cfg)]
+
+
+def config_types(cfg):
+    """Declared type of every rule, aligned with config_rules() ("" = plain text)"""
+    return [e[4] for e in _config_entries(cfg)]
+
+
+def split_segments(line):
+    """Columns of a dump line (2+ spaces = new column)"""
+    return [s.strip() for s in SEGMENT_SPLIT.split(line) if s.strip()]
+
+
+def match_rule(line, segments, partial, prefix, suffix):
+    """First segment containing partial → (column, cleaned value, segment index), or None"""
+    for index, seg in enumerate(segments):
+        if partial not in seg:
+            continue
+        cleaned = seg
+        offset = 0
+        if prefix and seg.startswith(prefix):
+            cleaned = cleaned[len(prefix):]
+            offset = len(prefix)
+        if suffix and cleaned.endswith(suffix):
+            cleaned = cleaned[:-len(suffix)]
+        if not cleaned:
+            continue
+        return line.find(seg) + offset, cleaned, index
+    return None
+
+
+def score_configs(configs, dump_lines):
+    """Rank every config against one dump → [(name, hits, total_rules), ...] best first.
+
+    Each dump line is tokenized once and each distinct rule is evaluated once,
+    no matter how many configs share it.
+    """
+    segments = {}
+    verdicts = {}
+    ranking = []
+    n = len(dump_lines)
+    for name, cfg in configs.items():
+        rules = config_rules(cfg)
+        hits = 0
+        for rule in rules:
+            hit = verdicts.get(rule)
+            if hit is None:
+                line_num = rule[0]
+                hit = False
+                if 0 < line_num <= n:
+                    segs = segments.get(line_num)
+                    if segs is None:
+                        segs = segments[line_num] = split_segments(dump_lines[line_num - 1])
+                    hit = match_rule(dump_lines[line_num - 1], segs, *rule[1:]) is not None
+                verdicts[rule] = hit
+            hits += hit
+        ranking.append((name, hits, len(rules)))
+    ranking.sort(key=lambda r: (-r[1], -(r[1] / r[2] if r[2] else 0), r[0].lower()))
+    return ranking
+
+
+class DumpDocument:
+    """The dump held ONCE as line-aligned chunks (str, or bytes / mmap read-only).
+
+    Lines are 1-based like Tk. A chunk never splits a line and keeps a lazy
+    array of its own line offsets, so an edit only re-copies the chunk(s) it
+    touches; the chunks after it are just shifted by the change in length
+    and line count. Line N is found with a bisect, never a splitlines() copy.
+    """
+    CHUNK = 64 * 1024  # chars per chunk (a chunk may grow to 2× before it is split)
+
+    def __init__(self, buf=""):
+        self.listeners = []        # fn(line, removed, added) — line None = whole text replaced
+        self.set_text(buf)
+
+    def _notify(self, line, removed, added):
+        for fn in self.listeners:
+            fn(line, removed, added)
+
+    def set_text(self, buf):
+        self._nl = "\n" if isinstance(buf, str) else b"\n"
+        self._chunks = self._split(buf, last=True)
+        self._nls = array("Q", (c.count(self._nl) for c in self._chunks))
+        self._local = [None] * len(self._chunks)   # per-chunk line start offsets (lazy)
+        self._first_line = array("Q")
+        self._first_off = array("Q")
+        line, off = 1, 0
+        for chunk, nls in zip(self._chunks, self._nls):
+            self._first_line.append(line)
+            self._first_off.append(off)
+            line += nls
+            off += len(chunk)
+        self._lines = line
+        self._size = off
+        self._notify(None, 0, 0)
+
+    def _split(self, text, last):
+        """Cut text into ~CHUNK pieces, each ending right after a newline.
+
+        Only the document's last chunk may lack the final newline (or be empty).
+        """
+        pieces, pos, size = [], 0, len(text)
+        while size - pos > self.CHUNK:
+            cut = text.find(self._nl, pos + self.CHUNK - 1)
+            if cut < 0:
+                break
+            pieces.append(text[pos:cut + 1])
+            pos = cut + 1
+        rest = text[pos:]
+        if rest or last or not pieces:
+            pieces.append(rest)
+        if not last and not pieces[-1]:
+            pieces.pop()
+        return pieces
+
+    def _replace_chunks(self, k1, k2, text):
+        """Chunks k1..k2 → text (re-split); later chunks are only shifted"""
+        if text and not text.endswith(self._nl) and k2 < len(self._chunks) - 1:
+            k2 += 1                       # newline at a chunk end was deleted → join the next chunk
+            text += self._chunks[k2]
+        last = k2 == len(self._chunks) - 1
+        pieces = self._split(text, last)
+        old_len = sum(len(c) for c in self._chunks[k1:k2 + 1])
+        old_nls = sum(self._nls[k1:k2 + 1])
+        nls = array("Q", (p.count(self._nl) for p in pieces))
+        starts_line, starts_off = array("Q"), array("Q")
+        line, off = self._first_line[k1], self._first_off[k1]
+        for piece, n in zip(pieces, nls):
+            starts_line.append(line)
+            starts_off.append(off)
+            line += n
+            off += len(piece)
+        self._chunks[k1:k2 + 1] = pieces
+        self._nls[k1:k2 + 1] = nls
+        self._local[k1:k2 + 1] = [None] * len(pieces)
+        self._first_line[k1:k2 + 1] = starts_line
+        self._first_off[k1:k2 + 1] = starts_off
+        d_lines = sum(nls) - old_nls
+        d_size = len(text) - old_len
+        first_line, first_off = self._first_line, self._first_off
+        for i in range(k1 + len(pieces), len(self._chunks)):
+            first_line[i] += d_lines
+            first_off[i] += d_size
+        self._lines += d_lines
+        self._size += d_size
+        return d_lines
+
+    def _chunk_of_line(self, n):
+        return bisect.bisect_right(self._first_line, n) - 1
+
+    def _chunk_of_offset(self, o):
+        return bisect.bisect_right(self._first_off, o) - 1
+
+    def _local_starts(self, k):
+        starts = self._local[k]
+        if starts is None:
+            starts = array("Q", [0])
+            chunk, nl = self._chunks[k], self._nl
+            pos = chunk.find(nl)
+            while pos >= 0:
+                starts.append(pos + 1)
+                pos = chunk.find(nl, pos + 1)
+            self._local[k] = starts
+        return starts
+
+    def _line_span(self, n):
+        """(chunk, local start, local end) of line n"""
+        k = self._chunk_of_line(n)
+        starts = self._local_starts(k)
+        i = n - self._first_line[k]
+        end = starts[i + 1] - 1 if i + 1 < len(starts) else len(self._chunks[k])
+        return k, starts[i], end
+
+    def line_count(self):
+        return self._lines
+
+    def __len__(self):
+        return self._lines
+
+    def size(self):
+        return self._size
+
+    def is_blank(self):
+        return all(not c.strip() for c in self._chunks)
+
+    def line_start(self, n):
+        k, start, _ = self._line_span(n)
+        return self._first_off[k] + start
+
+    def line_end(self, n):
+        """Offset of the newline ending line n (or end of buffer for the last line)"""
+        k, _, end = self._line_span(min(n, self._lines))
+        return self._first_off[k] + end
+
+    def line(self, n):
+        """Text of line n (1-based), without the newline"""
+        if not 0 < n <= self._lines:
+            raise IndexError(n)
+        k, start, end = self._line_span(n)
+        text = self._chunks[k][start:end]
+        if not isinstance(text, str):
+            text = text.decode("utf-8", errors="replace").rstrip("\r")
+        return text
+
+    def __getitem__(self, i):
+        """0-based, so a document can stand in for a list of lines (no negative indexes)"""
+        return self.line(i + 1)
+
+    def offset(self, line, col):
+        """Tk index (line.col) → buffer offset, clamped like Tk does"""
+        if line > self._lines:
+            return self._size
+        line = max(1, line)
+        return min(self.line_start(line) + col, self.line_end(line))
+
+    def slice(self, start, end):
+        """text[start:end] — zero-copy memoryview for bytes when it fits in one chunk"""
+        k = self._chunk_of_offset(start)
+        a = start - self._first_off[k]
+        chunk = self._chunks[k]
+        if end - self._first_off[k] <= len(chunk):
+            b = end - self._first_off[k]
+            return chunk[a:b] if isinstance(chunk, str) else memoryview(chunk)[a:b]
+        parts = [chunk[a:]]
+        k += 1
+        while k < len(self._chunks) and self._first_off[k] < end:
+            parts.append(self._chunks[k][:end - self._first_off[k]])
+            k += 1
+        return parts[0][:0].join(parts)
+
+    def text(self):
+        text = self._chunks[0][:0].join(self._chunks)
+        return text if isinstance(text, str) else text.decode("utf-8", errors="replace")
+
+    # --- incremental edits (str buffers, fed by the Tk text widget) ---
+    def insert(self, line, col, chars):
+        if not chars:
+            return
+        o = self.offset(line, col)
+        line = max(1, min(line, self._lines))
+        k = self._chunk_of_line(line)
+        chunk, p = self._chunks[k], o - self._first_off[k]
+        added = self._replace_chunks(k, k, chunk[:p] + chars + chunk[p:])
+        self._notify(line, 0, added)
+
+    def delete(self, line1, col1, line2, col2):
+        a = self.offset(line1, col1)
+        b = self.offset(line2, col2)
+        if b <= a:
+            return
+        line1 = max(1, line1)
+        k1 = self._chunk_of_offset(a)
+        k2 = self._chunk_of_offset(b - 1)
+        text = (self._chunks[k1][:a - self._first_off[k1]] +
+                self._chunks[k2][b - self._first_off[k2]:])
+        removed = -self._replace_chunks(k1, k2, text)
+        self._notify(line1, removed, 0)
+
+
+class DumpSearchIndex:
+    """Lazy trigram index over a DumpDocument, kept per block of lines.
+
+    Each block stores a Bloom-style bitmask of its (casefolded) trigrams, built
+    only when a search needs it. Edits just re-size the touched blocks and mark
+    them dirty, so the index follows the document without a full rebuild.
+    """
+    BLOCK = 256       # lines per block (= one search step, a few ms)
+    BITS = 4096       # bitmask size per block
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._blocks = None    # [[line_count, mask or None], ...]
+        doc.listeners.append(self._on_edit)
+
+    @staticmethod
+    def _grams(text):
+        return set(zip(text, text[1:], text[2:]))  # char tuples: ~2× faster to collect than slices
+
+    def _mask(self, grams):
+        # hash() of str is salted per process (PYTHONHASHSEED): masks are only
+        # comparable within one run, so this index must never be persisted.
+        bits = bytearray(self.BITS // 8)
+        for h in {hash(g) & (self.BITS - 1) for g in grams}:
+            bits[h >> 3] |= 1 << (h & 7)
+        return int.from_bytes(bits, "little")
+
+    def _on_edit(self, line, removed, added):
+        if self._blocks is None:
+            return
+        if line is None:
+            self._blocks = None
+            return
+        # find the blocks holding old lines line..line+removed
+        start = 1
+        first = last = None
+        for i, (count, _) in enumerate(self._blocks):
+            if first is None and line < start + count:
+                first = i
+            if line + removed < start + count:
+                last = i
+                break
+            start += count
+        if first is None:
+            first = len(self._blocks) - 1
+        if last is None:
+            last = len(self._blocks) - 1
+        count = sum(b[0] for b in self._blocks[first:last + 1]) - removed + added
+        merged = [[min(self.BLOCK, count - k), None] for k in range(0, count, self.BLOCK)]
+        self._blocks[first:last + 1] = merged
+
+    def _ensure_blocks(self):
+        if self._blocks is None:
+            n = self.doc.line_count()
+            self._blocks = [[min(self.BLOCK, n - k), None] for k in range(0, n, self.BLOCK)]
+
+    def _block_text(self, start, end):
+        text = self.doc.slice(self.doc.line_start(start), self.doc.line_end(end))
+        if not isinstance(text, str):
+            text = bytes(text).decode("utf-8", errors="replace")
+        return text
+
+    def search_steps(self, query, limit=None):
+        """Generator: case-insensitive search, one block per step (for UiScheduler)
+
+        Returns (matches, total) when exhausted — matches = [(line, col, end_col), ...]
+        in document order, at most `limit` of them; total counts every match.
+        Columns come from a regex run on the original text, so they stay valid
+        even where lower()/casefold() would change the length of the text.
+        Block masks are only built (lazily, step by step) for queries of 3+ chars.
+        """
+        if not query or "\n" in query:
+            return [], 0
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        q = query.casefold()
+        self._ensure_blocks()
+        qmask = self._mask(self._grams(q)) if len(q) >= 3 else 0
+        matches = []
+        total = 0
+        start = 1
+        for block in list(self._blocks):
+            count = block[0]
+            end = start + count - 1
+            text = None
+            if qmask and block[1] is None:
+                text = self._block_text(start, end)
+                block[1] = self._mask(self._grams(text.casefold()))
+            if not qmask or block[1] & qmask == qmask:
+                if text is None:
+                    text = self._block_text(start, end)
+                if limit and len(matches) >= limit:
+                    total += sum(1 for _ in pattern.finditer(text))
+                else:
+                    # line / column from the block's own newlines, counted incrementally
+                    line, line_at, pos = start, 0, 0
+                    for m in pattern.finditer(text):
+                        a = m.start()
+                        nl = text.count("\n", pos, a)
+                        if nl:
+                            line += nl
+                            line_at = text.rfind("\n", pos, a) + 1
+                        pos = a
+                        total += 1
+                        if not limit or len(matches) < limit:
+                            matches.append((line, a - line_at, m.end() - line_at))
+            start = end + 1
+            yield
+        return matches, total
+
+    def search(self, query, limit=None):
+        """Blocking search_steps() → (matches, total)"""
+        steps = self.search_steps(query, limit)
+        while True:
+            try:
+                next(steps)
+            except StopIteration as done:
+                return done.value
+
+
+def extract_record(lines, rules):
+    """One row per record: the cleaned value of every rule ("" when it does not match)"""
+    row = []
+    n = len(lines)
+    for line_num, partial, prefix, suffix in rules:
+        value = ""
+        if 0 < line_num <= n:
+            line = lines[line_num - 1]
+            hit = match_rule(line, split_segments(line), partial, prefix, suffix)
+            if hit:
+                value = hit[1].strip()
+        row.append(value)
+    return row
+
+
+@lru_cache(maxsize=256)
+def compile_extractor(rules):
+    """Specialised extract_record() for ONE rule set, generated with compile().
+
+    Line numbers, partials, prefixes and suffixes are baked in as constants and
+    every rule is unrolled; each referenced line is split only once. Cached by
+    the rules tuple, so editing a config's raw_lines regenerates it.
+    """
+    src = ["def extractor(lines):", "    n = len(lines)"]
+    split_done = set()
+    values = []
+    for i, (line_num, partial, prefix, suffix) in enumerate(rules):
+        v = f"v{i}"
+        values.append(v)
+        src.append(f"    {v} = ''")
+        if line_num <= 0:
+            continue
+        segs = f"segs{line_num}"
+        src.append(f"    if n >= {line_num}:")
+        if line_num not in split_done:
+            split_done.add(line_num)
+            src.append(f"        {segs} = split(lines[{line_num - 1}])")
+        src.append(f"        for seg in {segs}:")
+        src.append(f"            if {partial!r} not in seg: continue")
+        src.append("            c = seg")
+        if prefix:
+            src.append(f"            if c.startswith({prefix!r}): c = c[{len(prefix)}:]")
+        if suffix:
+            src.append(f"            if c.endswith({suffix!r}): c = c[:-{len(suffix)}]")
+        src.append("            if c:")
+        src.append(f"                {v} = c.strip()")
+        src.append("                break")
+    src.append(f"    return [{', '.join(values)}]")
+    namespace = {"split": split_segments}
+    exec(compile("\n".join(src), f"<CleanCore extractor: {len(rules)} rules>", "exec"), namespace)
+    return namespace["extractor"]
+
+
+def record_starts(buf, marker, start, end):
+    """Offsets in [start, end) where a record begins (a line starting with marker)"""
+    starts = [start]
+    if not marker:
+        return starts
+    needle = b"\n" + marker
+    pos = buf.find(needle, start, end)
+    while pos >= 0:
+        if pos + 1 > start:
+            starts.append(pos + 1)
+        pos = buf.find(needle, pos + 1, end)
+    return starts
+
+
+def plan_chunks(buf, marker, parts):
+    """Split buf into ~equal (start, end) chunks that always cut on a record boundary"""
+    size = len(buf)
+    if not marker or parts <= 1:
+        return [(0, size)]
+    cuts = [0]
+    for i in range(1, parts):
+        pos = buf.find(b"\n" + marker, max(size * i // parts, cuts[-1]) - 1)
+        if pos < 0:
+            break
+        if pos + 1 > cuts[-1]:
+            cuts.append(pos + 1)
+    cuts.append(size)
+    return list(zip(cuts, cuts[1:]))
+
+
+def _extract_chunk(job):
+    """Worker: map the file read-only (no text pickled) and extract every record of one chunk"""
+    path, start, end, marker, rules = job
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        starts = record_starts(mm, marker, start, end)
+        bounds = starts[1:] + [end]
+        extractor = compile_extractor(tuple(rules))
+        max_line = max((r[0] for r in rules), default=0)
+        # each record is split once, only up to the highest referenced line (no DumpDocument)
+        return [extractor([raw.decode("utf-8", errors="replace").rstrip("\r")
+                           for raw in mm[a:b].split(b"\n", max_line)[:max_line]])
+                for a, b in zip(starts, bounds)]
+
+
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024  # below this, process start-up costs more than it saves
+
+
+# === COMPRESSED DUMPS (.gz / .bz2 / .xz) ===
+COMPRESSION_MAGIC = [(b"\x1f\x8b", gzip.open), (b"BZh", bz2.open), (b"\xfd7zXZ\x00", lzma.open)]
+STREAM_CHUNK = 1024 * 1024
+
+
+def _compressed_opener(path):
+    with open(path, "rb") as f:
+        head = f.read(6)
+    for magic, opener in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return opener
+    return None
+
+
+def open_dump(path):
+    """Binary stream of a dump file — compressed ones are inflated on the fly (detected by magic bytes)"""
+    opener = _compressed_opener(path)
+    return opener(path, "rb") if opener else open(path, "rb")
+
+
+def read_dump_text(path):
+    """Whole dump as text, decompressed chunk by chunk (no temp file)"""
+    with open_dump(path) as f:
+        data = b"".join(iter(lambda: f.read(STREAM_CHUNK), b""))
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+
+def iter_stream_records(stream, marker=b"", max_line=None):
+    """Records (lists of lines) from a stream read in chunks — same record rules as record_starts().
+
+    Only the first max_line lines of each record are kept; with no marker the
+    whole file is ONE record, so reading stops right after max_line.
+    """
+    record, n, pending = [], 0, b""
+    size = 64 * 1024  # start small (headers), grow to STREAM_CHUNK
+    while True:
+        chunk = stream.read(size)
+        size = min(size * 2, STREAM_CHUNK)
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop() if chunk else b""
+        if not chunk and not lines[-1]:
+            lines.pop()  # file ends with a newline
+        for raw in lines:
+            if marker and n and raw.startswith(marker):
+                yield record
+                record, n = [], 0
+            n += 1
+            if max_line is None or n <= max_line:
+                record.append(raw.decode("utf-8", errors="replace").rstrip("\r"))
+            elif not marker:
+                yield record  # early exit: nothing past the highest referenced line is inflated
+                return
+        if not chunk:
+            break
+    if n:
+        yield record
+
+
+def extract_records(path, rules, marker="", workers=None):
+    """Extract every record of a (huge) multi-record dump file → rows in file order.
+
+    Records start at each line beginning with `marker` (no marker = one record).
+    Big files are cut into record-aligned chunks processed on all cores; each
+    worker mmaps the file itself and the rows are merged in input order, so
+    the output is identical to a sequential run. Compressed files are streamed
+    sequentially, reading no further than needed.
+    """
+    size = os.path.getsize(path)
+    if not size:
+        return []
+    marker = marker.encode("utf-8")
+    if _compressed_opener(path):
+        max_line = max((r[0] for r in rules), default=0)
+        extractor = compile_extractor(tuple(rules))
+        with open_dump(path) as stream:
+            return [extractor(rec) for rec in iter_stream_records(stream, marker, max_line)]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or size < PARALLEL_MIN_BYTES:
+        return _extract_chunk((path, 0, size, marker, rules))
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        chunks = plan_chunks(mm, marker, workers * 4)
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_extract_chunk, [(path, a, b, marker, rules) for a, b in chunks]):
+            rows.extend(part)
+    return rows
+
+
+# === RULE TELEMETRY ===
+# rule_stats.bin is append-only: per run (EXECUTE / AUTO / FILE) one header (time, name
+# length, rule count), the config name (utf-8), then one 9-byte record per rule
+# (id, segment index / -1, µs). Past STATS_MAX_BYTES it is compacted to the last
+# STATS_KEEP_RUNS runs of each config.
+RUN_HEADER = struct.Struct("<IHH")
+RULE_RECORD = struct.Struct("<IbI")
+STATS_WINDOW = 10  # recent runs compared against the older ones
+STATS_MAX_BYTES = 4 * 1024 * 1024
+STATS_KEEP_RUNS = 200
+
+
+def rule_id(rule):
+    """Stable id of a rule (changes when the rule text changes)"""
+    return zlib.crc32("\x1f".join(str(x) for x in rule[:4]).encode("utf-8"))
+
+
+def run_rules(lines, rules):
+    """Match every rule against one dump → (hits, telemetry)
+
+    hits = [(rule, (col, cleaned, seg_index) or None), ...]; telemetry is ready
+    for append_rule_stats(). Only the matching itself is timed.
+    """
+    ids = [rule_id(rule) for rule in rules]
+    n = len(lines)
+    hits, telemetry = [], []
+    for rid, rule in zip(ids, rules):
+        line_num, partial, prefix, suffix = rule
+        t0 = time.perf_counter_ns()
+        hit = None
+        if 0 < line_num <= n:
+            line = lines[line_num - 1]
+            hit = match_rule(line, split_segments(line), partial, prefix, suffix)
+        us = (time.perf_counter_ns() - t0) // 1000
+        hits.append((rule, hit))
+        telemetry.append((rid, hit[2] if hit else -1, us))
+    return hits, telemetry
+
+
+def _iter_runs(data):
+    """(name, start, end) of every complete run in a stats buffer — stops at a torn tail"""
+    pos, end = 0, len(data)
+    while pos + RUN_HEADER.size <= end:
+        _, name_len, count = RUN_HEADER.unpack_from(data, pos)
+        stop = pos + RUN_HEADER.size + name_len + count * RULE_RECORD.size
+        if stop > end:
+            break  # torn tail (crash while writing) → cut off by the next append
+        name_at = pos + RUN_HEADER.size
+        yield data[name_at:name_at + name_len].decode("utf-8", errors="replace"), pos, stop
+        pos = stop
+
+
+_stats_good = {}  # path → (device, inode, size) known to end on a run boundary
+
+
+def _cut_torn_tail(path):
+    """Truncate the log to its last complete run, so new runs never land after garbage"""
+    st = os.stat(path)
+    if _stats_good.get(path) == (st.st_dev, st.st_ino, st.st_size):
+        return
+    with open(path, "r+b") as f:
+        data = f.read()
+        good = 0
+        for _, _, stop in _iter_runs(data):
+            good = stop
+        if good < len(data):
+            f.truncate(good)
+
+
+def append_rule_stats(config_name, telemetry, path=STATS_FILE):
+    """telemetry = [(rule_id, segment index or -1, duration µs), ...] of ONE run"""
+    if os.path.exists(path):
+        _cut_torn_tail(path)
+    telemetry = telemetry[:65535]  # the count is packed as uint16
+    name = config_name.encode("utf-8")[:65535]
+    parts = [RUN_HEADER.pack(int(time.time()), len(name), len(telemetry)), name]
+    for rid, seg, us in telemetry:
+        parts.append(RULE_RECORD.pack(rid, max(-1, min(seg, 127)), min(us, 0xFFFFFFFF)))
+    with open(path, "ab") as f:
+        f.write(b"".join(parts))
+        size = f.tell()
+    st = os.stat(path)
+    _stats_good[path] = (st.st_dev, st.st_ino, size)
+    if size > STATS_MAX_BYTES:
+        compact_rule_stats(path)
+
+
+def compact_rule_stats(path=STATS_FILE, keep=STATS_KEEP_RUNS):
+    """Rewrite the log with only the last `keep` runs of each config (order kept, atomic replace)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    runs = list(_iter_runs(data))
+    left = {}
+    for name, _, _ in runs:
+        left[name] = left.get(name, 0) + 1
+    parts = []
+    for name, start, stop in runs:
+        left[name] -= 1
+        if left[name] < keep:
+            parts.append(data[start:stop])
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"".join(parts))
+    os.replace(tmp, path)
+
+
+_stats_cache = {}  # path → (file id, bytes parsed, stats)
+
+
+def load_rule_stats(path=STATS_FILE):
+    """→ {config: {rule_id: {"runs", "hits", "time_us", "last_seg", "recent"}}}
+
+    The parsed summary is cached; while the log only grows, just the newly
+    appended runs are read. A compaction (new file) triggers a full re-read.
+    """
+    if not os.path.exists(path):
+        _stats_cache.pop(path, None)
+        return {}
+    st = os.stat(path)
+    file_id = (st.st_dev, st.st_ino)
+    cached = _stats_cache.get(path)
+    if cached and cached[0] == file_id and cached[1] <= st.st_size:
+        _, done, stats = cached
+    else:
+        done, stats = 0, {}
+    with open(path, "rb") as f:
+        f.seek(done)
+        data = f.read()
+    for name, start, stop in _iter_runs(data):
+        count = RUN_HEADER.unpack_from(data, start)[2]
+        per_rule = stats.setdefault(name, {})
+        for rid, seg, us in RULE_RECORD.iter_unpack(data[stop - count * RULE_RECORD.size:stop]):
+            c = per_rule.get(rid)
+            if c is None:
+                c = per_rule[rid] = {"runs": 0, "hits": 0, "time_us": 0, "last_seg": -1,
+                                     "recent": deque(maxlen=STATS_WINDOW)}
+            c["runs"] += 1
+            c["hits"] += seg >= 0
+            c["time_us"] += us
+            c["recent"].append(seg >= 0)
+            if seg >= 0:
+                c["last_seg"] = seg
+        done += stop - start
+    _stats_cache[path] = (file_id, done, stats)
+    return stats
+
+
+def rule_health(configs, stats, min_runs=STATS_WINDOW + 5):
+    """Rules that stopped matching (hit rate dropped) or never match → [(drop, config, rule, note)]"""
+    report = []
+    for name, cfg in configs.items():
+        per_rule = stats.get(name)
+        if not per_rule:
+            continue
+        for rule in config_rules(cfg):
+            c = per_rule.get(rule_id(rule))
+            if not c or c["runs"] < min_runs:
+                continue
+            avg_us = c["time_us"] / c["runs"]
+            if not c["hits"]:
+                report.append((1.0, name, rule, f"dead • 0/{c['runs']} runs • {avg_us:.0f}µs/run"))
+                continue
+            recent = sum(c["recent"]) / len(c["recent"])
+            older_runs = c["runs"] - len(c["recent"])
+            before = (c["hits"] - sum(c["recent"])) / older_runs
+            if before - recent >= 0.3:
+                report.append((before - recent, name, rule,
+                               f"hit rate {before:.0%} → {recent:.0%} • last seg #{c['last_seg']}"))
+    report.sort(key=lambda r: (-r[0], r[1].lower()))
+    return report
+
+
+# === SESSION SNAPSHOT ===
+# session_<user>.bin: b"CCS1" + (meta bytes, range count, dump bytes) + meta JSON
+#              + uint32 [line, col, end_line, end_col] per match + dump utf-8
+SESSION_MAGIC = b"CCS1"
+SESSION_HEADER = struct.Struct("<4sIII")
+
+
+def _le_array(values):
+    ranges = array("I", values)
+    if sys.byteorder != "little":
+        ranges.byteswap()
+    return ranges
+
+
+def save_session(meta, ranges, text, path):
+    """Write dump + meta + match ranges in one compact binary file (atomic replace)"""
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    ranges = _le_array(ranges)
+    dump = text.encode("utf-8")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(SESSION_HEADER.pack(SESSION_MAGIC, len(meta_bytes), len(ranges) // 4, len(dump)))
+        f.write(meta_bytes)
+        f.write(ranges.tobytes())
+        f.write(dump)
+    os.replace(tmp, path)
+
+
+def load_session(path):
+    """Read a session file → (meta, flat ranges array, dump text) or None
+
+    A plain read: the dump has to become one str for the Tk widget anyway, so
+    mapping the file would not save the copy. Sections are sliced through a
+    memoryview to avoid extra intermediate copies.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) < SESSION_HEADER.size:
+        return None
+    with open(path, "rb") as f:
+        data = memoryview(f.read())
+    magic, meta_len, count, dump_len = SESSION_HEADER.unpack_from(data, 0)
+    pos = SESSION_HEADER.size
+    if magic != SESSION_MAGIC or pos + meta_len + count * 16 + dump_len > len(data):
+        return None
+    meta = json.loads(str(data[pos:pos + meta_len], "utf-8"))
+    pos += meta_len
+    ranges = array("I")
+    ranges.frombytes(data[pos:pos + count * 16])
+    if sys.byteorder != "little":
+        ranges.byteswap()
+    pos += count * 16
+    text = str(data[pos:pos + dump_len], "utf-8", errors="replace")
+    return meta, ranges, text
+
+
+# === TYPED COLUMNS ===
+# Rule types: "int" • "decimal" / "decimal:,." (decimal sep + thousands sep)
+#             "date:%d.%m.%Y" • "upper" • "lower" • "trim" (collapse spaces) • "text"
+# Missing / invalid values: decimal → NaN, date → NaT, int → INT_MISSING
+# (int64 min; None without NumPy). Non-whole numbers in an "int" column are invalid.
+CURRENCY_CHARS = " \t€$£¥%"
+# only these codes are stripped — any other letters leave the value unparsable (NaN)
+CURRENCY_CODES = re.compile(r"^(?:EUR|USD|GBP|CHF|JPY|BRL|R\$|CAD|AUD|CNY|SEK|NOK|DKK|PLN)\s*"
+                            r"|\s*(?:EUR|USD|GBP|CHF|JPY|BRL|CAD|AUD|CNY|SEK|NOK|DKK|PLN)$", re.IGNORECASE)
+TYPE_KINDS = ("text", "int", "decimal", "date", "upper", "lower", "trim")
+INT_MISSING = -2 ** 63
+
+
+def _parse_type(spec):
+    kind, _, arg = spec.partition(":")
+    return kind.strip().lower(), arg
+
+
+def valid_type(spec):
+    """True for "" and every supported type spec (typos → False)"""
+    if not spec.strip():
+        return True
+    kind, arg = _parse_type(spec)
+    if kind not in TYPE_KINDS:
+        return False
+    if kind == "date":
+        return bool(arg.strip())
+    if kind == "decimal":
+        return len(arg) <= 2
+    return not arg
+
+
+def _to_float(text):
+    """Number of a (separator-normalised) value; currency codes removed, inf / garbage → NaN"""
+    try:
+        x = float(CURRENCY_CODES.sub("", text).strip(CURRENCY_CHARS))
+    except ValueError:
+        return float("nan")
+    return x if math.isfinite(x) else float("nan")
+
+
+def _to_date(text, fmt):
+    try:
+        return datetime.strptime(text, fmt).date()
+    except ValueError:
+        return None
+
+
+def _decimal_text(values, arg):
+    dec = arg[0] if arg else "."
+    thousands = arg[1:2]
+    out = []
+    for v in values:
+        v = v.strip(CURRENCY_CHARS)
+        if thousands:
+            v = v.replace(thousands, "")
+        out.append(v.replace(dec, ".") if dec != "." else v)
+    return out
+
+
+def convert_column(values, spec):
+    """Convert a whole column at once → NumPy array (plain list when NumPy is missing)
+
+    Missing / unparsable: decimal → NaN, date → NaT, int → INT_MISSING
+    (None for int and date without NumPy). Unknown types raise ValueError.
+    """
+    if not valid_type(spec):
+        raise ValueError(f'unknown rule type "{spec}"')
+    kind, arg = _parse_type(spec)
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    if np is None:
+        if kind in ("decimal", "int"):
+            nums = [_to_float(v) for v in _decimal_text(values, arg if kind == "decimal" else ".")]
+            if kind == "int":
+                return [int(x) if x == x and abs(x) < 2.0 ** 63 and x.is_integer() else None for x in nums]
+            return nums
+        if kind == "date":
+            return [_to_date(v, arg) for v in values]
+        if kind == "upper":
+            return [v.upper() for v in values]
+        if kind == "lower":
+            return [v.lower() for v in values]
+        if kind == "trim":
+            return [" ".join(v.split()) for v in values]
+        return list(values)
+
+    arr = np.asarray(values, dtype=str)
+    if kind in ("decimal", "int"):
+        dec, thousands = (arg[0] if arg else "."), arg[1:2]
+        arr = np.char.strip(arr, CURRENCY_CHARS)
+        if thousands:
+            arr = np.char.replace(arr, thousands, "")
+        if dec != ".":
+            arr = np.char.replace(arr, dec, ".")
+        arr = np.where(arr == "", "nan", arr)
+        try:
+            nums = arr.astype(np.float64)
+        except ValueError:       # currency codes / garbage → parse each DISTINCT value once
+            uniq, inv = np.unique(arr, return_inverse=True)
+            nums = np.array([_to_float(u) for u in uniq], dtype=np.float64)[inv]
+        nums[np.isinf(nums)] = np.nan
+        if kind == "decimal":
+            return nums
+        # int: always int64; missing, fractional or out-of-range → INT_MISSING
+        ok = np.isfinite(nums) & (nums == np.floor(nums)) & (np.abs(nums) < 2.0 ** 63)
+        ints = np.full(nums.shape, INT_MISSING, dtype=np.int64)
+        ints[ok] = nums[ok].astype(np.int64)
+        return ints
+    if kind == "date":
+        uniq, inv = np.unique(arr, return_inverse=True)
+        dates = [_to_date(u, arg) for u in uniq]
+        conv = np.array([d.isoformat() if d else "NaT" for d in dates], dtype="datetime64[D]")
+        return conv[inv]
+    if kind == "upper":
+        return np.char.upper(arr)
+    if kind == "lower":
+        return np.char.lower(arr)
+    if kind == "trim":
+        uniq, inv = np.unique(arr, return_inverse=True)
+        return np.array([" ".join(u.split()) for u in uniq], dtype=str)[inv]
+    return arr
+
+
+def column_name(rule):
+    return f"L{rule[0]}_" + re.sub(r"\W+", "_", rule[1]).strip("_")
+
+
+def records_to_columns(rows, rules, types):
+    """Rows of raw strings → {column name: typed column}, converted column by column"""
+    columns = {}
+    raw_columns = list(zip(*rows)) if rows else [() for _ in rules]
+    for rule, spec, raw in zip(rules, types, raw_columns):
+        name = column_name(rule)
+        while name in columns:
+            name += "_"
+        columns[name] = convert_column(list(raw), spec)
+    return columns
+
+
+def column_text(column):
+    """Typed column → strings for TSV output (missing numbers / dates → empty, text untouched)"""
+    if hasattr(column, "astype"):
+        import numpy as np
+        text = column.astype(str)
+        kind = column.dtype.kind
+        if kind == "f":
+            missing = np.isnan(column)
+        elif kind == "M":
+            missing = np.isnat(column)
+        elif kind == "i":
+            missing = column == INT_MISSING
+        else:
+            return text.tolist()
+        return np.where(missing, "", text).tolist()
+    return ["" if v is None or (isinstance(v, float) and v != v) else str(v) for v in column]
+
+
+# === CONFIG INDEX ===
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ConfigIndex:
+    """Search index over config names + rule text: sorted names for prefix
+    lookups, trigram → names postings for substring lookups. Updated per config."""
+
+    def __init__(self, configs=None):
+        self._text = {}        # name → lowercased "name\nrule text"
+        self._grams = {}       # trigram → {names}
+        self._sorted = []      # [(lowercased name, name)] for prefix bisect
+        for name, cfg in (configs or {}).items():
+            self.add(name, cfg)
+
+    def add(self, name, cfg):
+        if name in self._text:
+            self.remove(name)
+        raw = cfg.get("raw_lines", []) if isinstance(cfg, dict) else []
+        if not raw:  # legacy list format / entries only → index the rules themselves
+            entries = cfg.get("entries", []) if isinstance(cfg, dict) else cfg
+            raw = [e if isinstance(e, str) else e.get("raw") or e.get("partial", "") for e in entries]
+        text = (name + "\n" + "\n".join(raw)).lower()
+        self._text[name] = text
+        for g in _trigrams(text):
+            self._grams.setdefault(g, set()).add(name)
+        bisect.insort(self._sorted, (name.lower(), name))
+
+    def remove(self, name):
+        text = self._text.pop(name, None)
+        if text is None:
+            return
+        for g in _trigrams(text):
+            names = self._grams.get(g)
+            if names:
+                names.discard(name)
+                if not names:
+                    del self._grams[g]
+        i = bisect.bisect_left(self._sorted, (name.lower(), name))
+        if i < len(self._sorted) and self._sorted[i][1] == name:
+            del self._sorted[i]
+
+    def rename(self, old, new, cfg):
+        self.remove(old)
+        self.add(new, cfg)
+
+    def search(self, query):
+        """Names matching query: name prefix first, then name substring, then rule text"""
+        q = query.strip().lower()
+        if not q:
+            return [name for _, name in self._sorted]
+
+        i = bisect.bisect_left(self._sorted, (q,))
+        prefix = []
+        while i < len(self._sorted) and self._sorted[i][0].startswith(q):
+            prefix.append(self._sorted[i][1])
+            i += 1
+
+        if len(q) >= 3:
+            postings = sorted((self._grams.get(g, set()) for g in _trigrams(q)), key=len)
+            candidates = set.intersection(*postings) if postings and postings[0] else set()
+        else:
+            candidates = self._text.keys()
+        seen = set(prefix)
+        in_name, in_rules = [], []
+        for name in candidates:
+            if name in seen:
+                continue
+            text = self._text[name]
+            if q in text:
+                (in_name if q in name.lower() else in_rules).append(name)
+        in_name.sort(key=str.lower)
+        in_rules.sort(key=str.lower)
+        return prefix + in_name + in_rules
+
+
+class UiScheduler:
+    """Coalesces UI work: one pending run per (widget, task), flushed at most once per frame.
+
+    A task may return a generator — it is then stepped across frames within
+    the per-frame time budget, so big jobs never block input.
+    """
+    FRAME_MS = 16
+    BUDGET_MS = 8
+
+    def __init__(self, root):
+        self.root = root
+        self._pending = {}      # (widget, task) → callable or running generator
+        self._after_id = None
+
+    def schedule(self, widget, task, fn):
+        key = (str(widget), task)
+        self._pending.pop(key, None)   # re-queue at the end, newest wins
+        self._pending[key] = fn
+        if self._after_id is None:
+            self._after_id = self.root.after(self.FRAME_MS, self._flush)
+
+    def _flush(self):
+        self._after_id = None
+        deadline = time.perf_counter() + self.BUDGET_MS / 1000
+        try:
+            while self._pending and time.perf_counter() < deadline:
+                key = next(iter(self._pending))
+                job = self._pending.pop(key)
+                try:
+                    if hasattr(job, "__next__"):
+                        next(job)
+                    else:
+                        job = job()
+                        if not hasattr(job, "__next__"):
+                            continue
+                    if key not in self._pending:   # not finished → continue next round
+                        self._pending[key] = job
+                except StopIteration:
+                    pass
+                except Exception as e:
+                    print(f"[CleanCore] UI task {key[1]} failed: {e}")
+        finally:
+            if self._pending and self._after_id is None:
+                self._after_id = self.root.after(self.FRAME_MS, self._flush)
+
+
 class LineNumberText(ctk.CTkFrame):
-    def __init__(self, master, font_size=11, **kwargs):
+    GUTTER_CHUNK = 20000             # line numbers inserted per scheduler step
+    BULK_PASTE_CHARS = 256 * 1024    # pastes this big replacing the dump skip the undo stack
+
+    def __init__(self, master, font_size=11, scheduler=None, undo_depth=200, undo_limit_mb=32, **kwargs):
         super().__init__(master, fg_color="transparent")
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
@@ -167,6 +1330,16 @@ class LineNumberText(ctk.CTkFrame):
         )
         self.text.grid(row=0, column=1, sticky="nsew")
 
+        # Undo is bounded: max N edit groups + a rough byte cap (oldest groups dropped beyond it)
+        self.text._textbox.configure(maxundo=undo_depth)
+        self.undo_depth = undo_depth
+        self.undo_limit = undo_limit_mb * 1024 * 1024
+        self._reset_undo_sizes()
+
+        # Shared document model — kept in sync with every edit via a Tk command proxy
+        self.doc = DumpDocument()
+        self._install_edit_proxy()
+
         self.h_scroll = ctk.CTkScrollbar(self, orientation="horizontal", command=self.text._textbox.xview)
         self.h_scroll.grid(row=1, column=1, sticky="ew")
         self.text._textbox.configure(xscrollcommand=self.h_scroll.set)
@@ -174,14 +1347,19 @@ class LineNumberText(ctk.CTkFrame):
         self.text._textbox.tag_configure("bold",
             font=ctk.CTkFont("Consolas", self.font_size, weight="bold"), foreground="#00ff00")
 
-        self.text._textbox.bind("<<Modified>>", lambda e: self.after(10, self._update_line_numbers))
-        self.text._textbox.bind("<KeyRelease>", lambda e: self.after(10, self._update_line_numbers))
-        self.text._textbox.bind("<MouseWheel>", lambda e: self.after(10, self._sync_scroll))
-        self.text._textbox.bind("<Button-4>", lambda e: self.after(10, self._sync_scroll))
-        self.text._textbox.bind("<Button-5>", lambda e: self.after(10, self._sync_scroll))
+        # All refreshes go through the scheduler → coalesced to 1 per frame
+        self.scheduler = scheduler or UiScheduler(self)
+        self._gutter_lines = 0
+        self.text._textbox.bind("<<Modified>>", lambda e: self._schedule_gutter())
+        self.text._textbox.bind("<KeyRelease>", lambda e: self._schedule_gutter())
+        self.text._textbox.bind("<MouseWheel>", lambda e: self._schedule_scroll())
+        self.text._textbox.bind("<Button-4>", lambda e: self._schedule_scroll())
+        self.text._textbox.bind("<Button-5>", lambda e: self._schedule_scroll())
         self.text._textbox.config(yscrollcommand=self._on_text_scroll)
+        self.text._textbox.bind("<<Paste>>", self._on_paste)
 
         self._setup_context_menu()
+        self._setup_find_bar()
         self._update_line_numbers()
 
     def update_font_size(self, delta):
@@ -196,6 +1374,7 @@ class LineNumberText(ctk.CTkFrame):
     def _setup_context_menu(self):
         menu = ctk.CTkFrame(self.text, fg_color="#2b2b2b", border_width=1)
         items = [("Cut", "<<Cut>>"), ("Copy", "<<Copy>>"), ("Paste", "<<Paste>>"),
+                 ("Replace All", self._replace_from_clipboard),
                  ("Select All", lambda: self.text._textbox.tag_add("sel", "1.0", "end"))]
         for text, cmd in items:
             ctk.CTkButton(menu, text=text, width=100, height=25, fg_color="transparent", hover_color="#3a3a3a",
@@ -203,8 +1382,15 @@ class LineNumberText(ctk.CTkFrame):
         self.text._textbox.bind("<Button-3>", lambda e: menu.place(x=e.x_root-self.winfo_rootx(), y=e.y_root-self.winfo_rooty()))
         self.text._textbox.bind("<Button-1>", lambda e: menu.place_forget())
 
+    def _schedule_gutter(self):
+        if self._gutter_lines != self.doc.line_count():
+            self.scheduler.schedule(self, "gutter", self._line_number_job)
+
+    def _schedule_scroll(self):
+        self.scheduler.schedule(self, "scroll", self._sync_scroll)
+
     def _on_text_scroll(self, *args):
-        self.after(10, self._sync_scroll)
+        self._schedule_scroll()
 
     def _sync_scroll(self, *args):
         try:
@@ -212,12 +1398,287 @@ class LineNumberText(ctk.CTkFrame):
         except:
             pass
 
+    def _install_edit_proxy(self):
+        """Route the Tk text command through _dispatch (same trick as IDLE's redirector)"""
+        w = self.text._textbox
+        self._tk_orig = w._w + "_orig"
+        w.tk.call("rename", w._w, self._tk_orig)
+        w.tk.createcommand(w._w, self._dispatch)
+
+    def _tk_index(self, index):
+        line, col = str(self.text._textbox.tk.call(self._tk_orig, "index", index)).split(".")
+        return int(line), int(col)
+
+    def _dispatch(self, cmd, *args):
+        tk = self.text._textbox.tk
+        orig = self._tk_orig
+        if cmd == "insert" and len(args) >= 2:
+            pos = self._tk_index(args[0])
+            result = tk.call((orig, cmd) + args)
+            chars = "".join(str(a) for a in args[1::2])
+            self.doc.insert(*pos, chars)
+            self._count_undo(len(chars), "insert")
+            self._schedule_gutter()
+            return result
+        if cmd == "delete" and len(args) in (1, 2):
+            a = self._tk_index(args[0])
+            b = self._tk_index(args[1] if len(args) == 2 else f"{args[0]}+1c")
+            result = tk.call((orig, cmd) + args)
+            size = self.doc.size()
+            self.doc.delete(*a, *b)
+            self._count_undo(size - self.doc.size(), "delete")
+            self._schedule_gutter()
+            return result
+        if cmd == "replace" and len(args) >= 3:
+            a = self._tk_index(args[0])
+            b = self._tk_index(args[1])
+            result = tk.call((orig, cmd) + args)
+            size = self.doc.size()
+            self.doc.delete(*a, *b)
+            chars = "".join(str(x) for x in args[2::2])
+            self.doc.insert(*a, chars)
+            self._count_undo(size - self.doc.size() + 2 * len(chars), "replace")
+            self._schedule_gutter()
+            return result
+        if cmd == "edit" and args:
+            return self._dispatch_edit(args)
+        result = tk.call((orig, cmd) + args)
+        if cmd in ("insert", "delete", "replace"):  # unusual form → resync from Tk
+            self.resync()
+        return result
+
+    def _dispatch_edit(self, args):
+        """`edit undo/redo/separator/reset` → keep the per-group undo sizes in step with Tk"""
+        tk = self.text._textbox.tk
+        op = str(args[0])
+        if op in ("undo", "redo"):
+            self._undoing = True  # the edits Tk replays come back through _dispatch
+            try:
+                result = tk.call((self._tk_orig, "edit") + args)
+            finally:
+                self._undoing = False
+            src, dst = (self._undo_groups, self._redo_groups) if op == "undo" else (self._redo_groups, self._undo_groups)
+            if src:
+                size = src.pop()
+                dst.append(size)
+                self._undo_chars += size if op == "redo" else -size
+            self._undo_kind = None
+            return result
+        result = tk.call((self._tk_orig, "edit") + args)
+        if op == "separator":
+            self._undo_kind = None
+        elif op == "reset":
+            self._reset_undo_sizes()
+        return result
+
+    def _reset_undo_sizes(self):
+        self._undo_groups = deque()  # chars per undo group, oldest first (last = open group)
+        self._redo_groups = []
+        self._undo_chars = 0
+        self._undo_kind = None
+        self._undoing = False
+
+    def _count_undo(self, chars, kind):
+        """Tk keeps a copy of every edited char on the undo stack → past the cap, drop the OLDEST groups.
+
+        Groups are split the way Tk's autoseparators split them (edit kind
+        changes + explicit separators). Tk trims the bottom of its stack when
+        -maxundo is lowered, so it is briefly lowered to the groups that fit.
+        """
+        if self._undoing:
+            return
+        self._redo_groups.clear()  # a new edit discards the redo stack, as in Tk
+        if kind != self._undo_kind or not self._undo_groups:
+            self._undo_groups.append(0)
+            if self.undo_depth and len(self._undo_groups) > self.undo_depth + 1:  # Tk dropped it (maxundo)
+                self._undo_chars -= self._undo_groups.popleft()
+        self._undo_kind = kind
+        self._undo_groups[-1] += chars
+        self._undo_chars += chars
+        if self._undo_chars <= self.undo_limit:
+            return
+        while self._undo_chars > self.undo_limit and len(self._undo_groups) > 1:
+            self._undo_chars -= self._undo_groups.popleft()
+        tk = self.text._textbox.tk
+        # Tk: -maxundo 0 means UNLIMITED, so "keep 0 closed groups" cannot be said
+        # with it → when only the open group is left (or it alone is over the
+        # cap), the whole stack is reset instead.
+        if self._undo_chars > self.undo_limit or len(self._undo_groups) < 2:
+            tk.call(self._tk_orig, "edit", "reset")
+            self._reset_undo_sizes()
+            return
+        tk.call(self._tk_orig, "configure", "-maxundo", len(self._undo_groups) - 1)  # closed groups to keep, ≥ 1
+        tk.call(self._tk_orig, "configure", "-maxundo", self.undo_depth)
+
+    def load_text(self, text):
+        """Bulk-load path: replace the whole dump WITHOUT recording it in the undo stack"""
+        tk = self.text._textbox.tk
+        tk.call(self._tk_orig, "configure", "-undo", 0)
+        tk.call(self._tk_orig, "delete", "1.0", "end")
+        tk.call(self._tk_orig, "insert", "1.0", text)
+        tk.call(self._tk_orig, "edit", "reset")
+        tk.call(self._tk_orig, "configure", "-undo", 1)
+        self._reset_undo_sizes()
+        self.doc.set_text(text)
+        self._schedule_gutter()
+
+    def _replace_from_clipboard(self):
+        try:
+            self.load_text(self.text._textbox.clipboard_get())
+        except Exception:
+            pass  # empty clipboard
+
+    def _on_paste(self, event=None):
+        """Huge paste replacing everything → bulk path (normal pastes keep undo)"""
+        w = self.text._textbox
+        try:
+            clip = w.clipboard_get()
+        except Exception:
+            return None
+        if len(clip) < self.BULK_PASTE_CHARS:
+            return None
+        sel = w.tag_ranges("sel")
+        everything = (self.doc.is_blank() or
+                      (sel and w.compare(sel[0], "==", "1.0") and w.compare(sel[1], ">=", "end-1c")))
+        if not everything:
+            return None
+        self.load_text(clip)
+        return "break"
+
+    def resync(self):
+        self.doc.set_text(str(self.text._textbox.tk.call(self._tk_orig, "get", "1.0", "end-1c")))
+        self._schedule_gutter()
+
+    def _line_number_job(self):
+        """Grow / shrink the gutter to the document's line count, a chunk per step"""
+        n = self.doc.line_count()
+        if n < self._gutter_lines:
+            self.line_numbers.configure(state="normal")
+            self.line_numbers.delete(f"{n}.end", "end")
+            self.line_numbers.configure(state="disabled")
+            self._gutter_lines = n
+        while self._gutter_lines < n:
+            a = self._gutter_lines + 1
+            b = min(n, a + self.GUTTER_CHUNK - 1)
+            self.line_numbers.configure(state="normal")
+            self.line_numbers.insert("end", ("\n" if a > 1 else "") + "\n".join(map(str, range(a, b + 1))))
+            self.line_numbers.configure(state="disabled")
+            self._gutter_lines = b
+            if b < n:
+                yield
+        self._sync_scroll()
+
     def _update_line_numbers(self):
-        self.line_numbers.configure(state="normal")
-        self.line_numbers.delete("1.0", "end")
-        n = len(self.text.get("1.0", "end-1c").splitlines())
-        self.line_numbers.insert("1.0", "\n".join(str(i) for i in range(1, n + 1)))
-        self.line_numbers.configure(state="disabled")
+        for _ in self._line_number_job():
+            pass
+
+    def add_tag_ranges(self, tag, indices):
+        """Tag many [start, end, start, end, ...] ranges in ONE Tk call"""
+        if indices:
+            self.text._textbox.tk.call(self._tk_orig, "tag", "add", tag, *indices)
+
+    def tag_ranges_flat(self, tag):
+        """[line, col, end_line, end_col, ...] of every range of a tag"""
+        flat = []
+        for index in self.text._textbox.tag_ranges(tag):
+            flat += map(int, str(index).split("."))
+        return flat
+
+    # === FIND BAR (Ctrl+F) ===
+    MAX_HIGHLIGHTS = 5000
+    MAX_MATCHES = 100000  # listed for ▲/▼; the count above it is still exact
+
+    def _setup_find_bar(self):
+        self.search_index = DumpSearchIndex(self.doc)
+        self.matches = []
+        self.match_total = 0
+        self.match_pos = -1
+
+        bar = self.find_bar = ctk.CTkFrame(self, fg_color="#1a1a1a")
+        self.find_entry = ctk.CTkEntry(bar, width=260, font=("Consolas", 13), placeholder_text="Find…")
+        self.find_entry.pack(side="left", padx=(5, 3), pady=4)
+        self.find_count = ctk.CTkLabel(bar, text="", width=110, font=("Consolas", 12), text_color="#888888")
+        self.find_count.pack(side="left", padx=3)
+        for text, cmd in (("▲", lambda: self._goto_match(-1)), ("▼", lambda: self._goto_match(+1)),
+                          ("→ rule", self._copy_match_as_rule), ("✕", self._hide_find_bar)):
+            ctk.CTkButton(bar, text=text, width=34 if len(text) == 1 else 70, height=26,
+                          fg_color="#3a3a3a", hover_color="#2b2b2b", command=cmd).pack(side="left", padx=2)
+
+        self.text._textbox.tag_configure("found", background="#5a4a00")
+        self.text._textbox.tag_configure("found_current", background="#b08d00", foreground="#000000")
+        self.text._textbox.bind("<Control-f>", self._show_find_bar)
+        self.find_entry.bind("<KeyRelease>", lambda e: e.keysym in ("Return", "Escape")
+                             or self.scheduler.schedule(self, "find", self._run_find))
+        self.find_entry.bind("<Return>", lambda e: self._goto_match(+1))
+        self.find_entry.bind("<Shift-Return>", lambda e: self._goto_match(-1))
+        self.find_entry.bind("<Escape>", lambda e: self._hide_find_bar())
+        self.doc.listeners.append(self._on_doc_edit_find)
+
+    def _on_doc_edit_find(self, *args):
+        if self.find_bar.winfo_ismapped():  # keep count / highlights in step with edits
+            self.scheduler.schedule(self, "find", lambda: self._run_find(jump=False))
+
+    def _show_find_bar(self, event=None):
+        self.find_bar.grid(row=2, column=0, columnspan=2, sticky="ew")
+        self.find_entry.focus_force()
+        self.scheduler.schedule(self, "find", self._run_find)
+        return "break"
+
+    def _hide_find_bar(self):
+        self.find_bar.grid_remove()
+        self.text._textbox.tag_remove("found", "1.0", "end")
+        self.text._textbox.tag_remove("found_current", "1.0", "end")
+        self.text._textbox.focus_set()
+
+    def _run_find(self, jump=True):
+        """Incremental search (generator task) → count + highlight all (capped) via the trigram index"""
+        w = self.text._textbox
+        w.tag_remove("found", "1.0", "end")
+        w.tag_remove("found_current", "1.0", "end")
+        query = self.find_entry.get()
+        self.matches, self.match_total = [], 0
+        self.match_pos = -1
+        self.find_count.configure(text="searching…" if query else "")
+        self.matches, self.match_total = yield from self.search_index.search_steps(query, self.MAX_MATCHES)
+        if not self.matches:
+            self.find_count.configure(text="no matches" if query else "")
+            return
+        ranges = []
+        for line, col, end in self.matches[:self.MAX_HIGHLIGHTS]:
+            ranges += [f"{line}.{col}", f"{line}.{end}"]
+        self.add_tag_ranges("found", ranges)
+        if jump:
+            self._goto_match(+1)
+        else:
+            self.find_count.configure(text=f"{self.match_total} matches")
+
+    def _goto_match(self, step):
+        if not self.matches:
+            return "break"
+        self.match_pos = (self.match_pos + step) % len(self.matches)
+        line, col, end = self.matches[self.match_pos]
+        w = self.text._textbox
+        w.tag_remove("found_current", "1.0", "end")
+        w.tag_add("found_current", f"{line}.{col}", f"{line}.{end}")
+        w.see(f"{line}.{col}")
+        self._schedule_scroll()
+        self.find_count.configure(text=f"{self.match_pos + 1}/{self.match_total} • L{line}:{col}")
+        return "break"
+
+    def _copy_match_as_rule(self):
+        """Current match → clipboard as a ready-to-paste config rule"""
+        if not self.matches:
+            return
+        line, col, end = self.matches[max(0, self.match_pos)]
+        partial = self.doc.line(line)[col:end]  # real case, rules are case-sensitive
+        # a rule partial must sit inside ONE segment (2+ spaces split them) and hold no quote
+        pieces = [p.strip() for p in SEGMENT_SPLIT.split(partial) if p.strip()]
+        partial = max(pieces[0].split('"'), key=len).strip() if pieces else ""
+        if not partial:
+            self.find_count.configure(text="no rule for this match")
+            return
+        self.clipboard_clear()
+        self.clipboard_append(f'{line}; "{partial}"')
 
     def get(self, s, e=None):
         return self.text.get(s) if e is None else self.text.get(s, e)
@@ -276,6 +1737,8 @@ def clean_input_dialog(title, text, default=""):
     return result[0]
 
 class CleanCore(ctk.CTk):
+    MAX_COMBO_VALUES = 30  # the rest is reachable through the 🔍 picker
+
     def __init__(self):
         super().__init__()
         self.username = get_current_username()
@@ -289,16 +1752,21 @@ class CleanCore(ctk.CTk):
         self.geometry(f"{self.width}x{self.height}+{self.x}+{self.y}")
 
         self.configs = self._load_configs()
+        self.config_index = ConfigIndex(self.configs)
+        self.recent_configs = []
         self.current_config = "default"
         self.font_size = self.user_cfg.get("font_size", 12)  # já existe
 
         self._setup_ui()
         self._load_first_config()
+        if self.keep_session.get():
+            self.after(50, self._restore_session)
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
 
     def load_user_config(self):
-        default = {"width": 1200, "height": 780, "x": 100, "y": 100, "font_size": 12}
+        default = {"width": 1200, "height": 780, "x": 100, "y": 100, "font_size": 12,
+                   "undo_depth": 200, "undo_limit_mb": 32, "keep_session": False}
 
         if os.path.exists(USER_SETTINGS_FILE):
             try:
@@ -414,7 +1882,10 @@ class CleanCore(ctk.CTk):
             "height": self.winfo_height(),
             "x": self.winfo_x(),
             "y": self.winfo_y(),
-            "font_size": self.font_size
+            "font_size": self.font_size,
+            "undo_depth": self.user_cfg.get("undo_depth", 200),
+            "undo_limit_mb": self.user_cfg.get("undo_limit_mb", 32),
+            "keep_session": bool(self.keep_session.get())
         }
 
         # Guarda também como "last_used" (para fallback)
@@ -430,8 +1901,39 @@ class CleanCore(ctk.CTk):
 
     def on_close(self):
         self.save_user_config()
+        self._save_session()
         self.destroy()
 
+    def _save_session(self):
+        """Snapshot dump + config + EXECUTE results (or drop the old one if disabled)"""
+        try:
+            path = session_file(self.username)
+            if not self.keep_session.get():
+                if os.path.exists(path):
+                    os.remove(path)  # only this user's snapshot
+                return
+            save_session({"config": self.current_config}, self.text_area.tag_ranges_flat("bold"),
+                         self.text_area.doc.text(), path)
+        except Exception as e:
+            print(f"[CleanCore] Erro ao gravar sessão: {e}")
+
+    def _restore_session(self):
+        """Bring back the last dump + highlights without re-pasting / re-executing"""
+        try:
+            session = load_session(session_file(self.username))
+        except Exception as e:
+            print(f"[CleanCore] Erro ao ler sessão: {e}")
+            return
+        if not session:
+            return
+        meta, ranges, text = session
+        name = meta.get("config")
+        if name in self.configs:
+            self.combo.set(name)
+            self._on_config_change(name)
+        self.text_area.load_text(text)
+        self.text_area.add_tag_ranges("bold", [f"{ranges[i]}.{ranges[i + 1]}" for i in range(0, len(ranges), 2)])
+
     def _load_configs(self):
         if os.path.exists(CONFIG_FILE):
             try:
@@ -453,14 +1955,21 @@ class CleanCore(ctk.CTk):
             json.dump({"configs": self.configs}, f, indent=2, ensure_ascii=False)
 
     def _setup_ui(self):
+        self.scheduler = UiScheduler(self)
+
         top = ctk.CTkFrame(self, height=70, fg_color="#1a1a1a")
         top.pack(fill="x", padx=20, pady=20)
         top.pack_propagate(False)
 
         ctk.CTkLabel(top, text="Config:", font=("Arial", 15, "bold")).pack(side="left", padx=10)
-        self.combo = ctk.CTkComboBox(top, values=list(self.configs.keys()), command=self._on_config_change, width=220)
+        self.combo = ctk.CTkComboBox(top, values=self._combo_values(), command=self._on_config_change, width=220)
         self.combo.pack(side="left", padx=5)
 
+        # === SEARCH (INDEXED CONFIG PICKER) ===
+        ctk.CTkButton(top, text="🔍", width=32, fg_color="#3a3a3a", hover_color="#2b2b2b",
+                      command=self._open_config_picker).pack(side="left", padx=(0, 3))
+        self.bind("<Control-p>", self._open_config_picker)
+
         # === + ADD BUTTON ===
         ctk.CTkButton(top, text="+", width=40, fg_color="#0d8e0d", hover_color="#006400",
                       command=self._add_config).pack(side="left", padx=3)
@@ -477,16 +1986,42 @@ class CleanCore(ctk.CTk):
         ctk.CTkButton(top, text="EXECUTE & SAVE", width=180, fg_color="#1f538d", hover_color="#0f3d6e",
                      font=("Arial", 12, "bold"), command=self._save_and_execute).pack(side="left", padx=10)
         
+        # === AUTO (BEST CONFIG FOR THIS DUMP) ===
+        ctk.CTkButton(top, text="AUTO", width=70, fg_color="#6a3dad", hover_color="#4f2d82",
+                     font=("Arial", 12, "bold"), command=self._auto_select_config).pack(side="left", padx=5)
+
         # === EXTRACT BUTTON ===
         ctk.CTkButton(top, text="EXTRACT", width=150, fg_color="#b0632d", hover_color="#8d4d1f",
                      command=self._extract).pack(side="left", padx=5)
         
+        # === OPEN (LOAD DUMP FILE, .gz/.bz2/.xz OK) ===
+        ctk.CTkButton(top, text="OPEN", width=70, fg_color="#3a3a3a", hover_color="#2b2b2b",
+                     command=self._open_dump_file).pack(side="left", padx=5)
+
+        # === FILE (MULTI-RECORD EXTRACT) ===
+        ctk.CTkButton(top, text="FILE", width=70, fg_color="#2d8d7a", hover_color="#1f6b5c",
+                     command=self._extract_file).pack(side="left", padx=5)
+
+        # === STATS (RULE HEALTH) ===
+        ctk.CTkButton(top, text="STATS", width=70, fg_color="#3a3a3a", hover_color="#2b2b2b",
+                     command=self._show_rule_stats).pack(side="left", padx=5)
+
         # === HELP / VIDEO ===
         help_btn = ctk.CTkButton(top, text="?", width=20, height=20, corner_radius=10,
                                  font=("Arial", 12, "bold"), fg_color="#2d6ced", hover_color="#1f4eb3",
                                  command=self._show_help_images)
         help_btn.pack(side="right", padx=10, pady=5)
 
+        # === KEEP SESSION (SNAPSHOT ON CLOSE) ===
+        self.keep_session = ctk.BooleanVar(value=bool(self.user_cfg.get("keep_session", False)))
+        ctk.CTkCheckBox(top, text="Keep session", variable=self.keep_session, width=20,
+                        font=("Arial", 11), checkbox_width=18, checkbox_height=18).pack(side="right", padx=5)
+
+        # === MEMORY READOUT ===
+        self.mem_label = ctk.CTkLabel(top, text="", font=("Consolas", 11), text_color="#888888")
+        self.mem_label.pack(side="right", padx=5)
+        self._update_memory_readout()
+
         main = ctk.CTkFrame(self)
         main.pack(fill="both", expand=True, padx=10, pady=(0, 10))
         main.grid_columnconfigure(0, minsize=350, weight=0)
@@ -502,19 +2037,21 @@ class CleanCore(ctk.CTk):
         ctk.CTkButton(header, text="A-", width=30, command=lambda: self._change_font(-1)).pack(side="right", padx=2)
         ctk.CTkButton(header, text="A+", width=30, command=lambda: self._change_font(+1)).pack(side="right")
 
-        ctk.CTkLabel(left, text='line; "partial"; "prefix"; "suffix"\n## \\n = blank line', 
+        ctk.CTkLabel(left, text='line; "partial"; "prefix"; "suffix"; "type"\n## \\n = blank line', 
                      font=("Consolas", 10), text_color="#888888").pack(pady=(0,5))
 
         self.config_text = ctk.CTkTextbox(left, font=("Consolas", self.font_size), undo=True)
         self.config_text.pack(fill="both", expand=True, padx=15, pady=(0, 10))
         self.config_text._textbox.tag_configure("error", background="#4d1a1a")
-        self.config_text._textbox.bind("<<Modified>>", self._validate_config_syntax)
-        self.config_text._textbox.bind("<KeyRelease>", self._validate_config_syntax)
+        self.config_text._textbox.bind("<<Modified>>", self._schedule_validation)
+        self.config_text._textbox.bind("<KeyRelease>", self._schedule_validation)
 
         right = ctk.CTkFrame(main)
         right.grid(row=0, column=1, sticky="nsew", padx=(5, 0))
         ctk.CTkLabel(right, text="Paste / Edit ", font=("Arial", 16, "bold")).pack(pady=10)
-        self.text_area = LineNumberText(right, font_size=self.font_size)
+        self.text_area = LineNumberText(right, font_size=self.font_size, scheduler=self.scheduler,
+                                        undo_depth=self.user_cfg.get("undo_depth", 200),
+                                        undo_limit_mb=self.user_cfg.get("undo_limit_mb", 32))
         self.text_area.pack(fill="both", expand=True, padx=15, pady=(0, 15))
 
         random_phrase = random.choice(self.phrases)
@@ -523,6 +2060,15 @@ class CleanCore(ctk.CTk):
         ctk.CTkLabel(self, text="CleanCore © \nMade by: @Dpereira88 • Nov 2025",
                      text_color="#888888", font=("Consolas", 13), justify="center").pack(pady=(0, 15))
 
+    def _update_memory_readout(self):
+        mb = process_memory_mb()
+        self.mem_label.configure(text=f"RAM {mb:.0f} MB" if mb is not None else "")
+        self.after(2000, self._update_memory_readout)
+
+    def _schedule_validation(self, event=None):
+        self.config_text._textbox.edit_modified(False)  # re-arm <<Modified>>
+        self.scheduler.schedule(self.config_text, "validate", self._validate_config_syntax)
+
     def _validate_config_syntax(self, event=None):
         self.config_text._textbox.edit_modified(False)
         self.config_text._textbox.tag_remove("error", "1.0", "end")
@@ -530,7 +2076,8 @@ class CleanCore(ctk.CTk):
             s = line.strip()
             if not s or s.startswith("#"):
                 continue
-            if not re.match(r'^\s*\d+\s*;\s*"[^"]*"(?:\s*;\s*"[^"]*")?(?:\s*;\s*"[^"]*")?\s*$', s):
+            m = RULE_PATTERN.match(s)
+            if not m or not valid_type(m.group(5) or ""):
                 self.config_text._textbox.tag_add("error", f"{i}.0", f"{i}.end")
 
     def _change_font(self, delta):
@@ -547,6 +2094,11 @@ class CleanCore(ctk.CTk):
 
     def _on_config_change(self, name):
         self.current_config = name
+        if name in self.recent_configs:
+            self.recent_configs.remove(name)
+        self.recent_configs.insert(0, name)
+        del self.recent_configs[self.MAX_COMBO_VALUES:]
+        self._refresh_combo()
         cfg = self.configs.get(name, {"entries": [], "raw_lines": []})
         if cfg.get("raw_lines"):
             text = "\n".join(cfg["raw_lines"])
@@ -561,9 +2113,11 @@ class CleanCore(ctk.CTk):
                     p = e.get("partial", "")
                     pre = e.get("prefix", "")
                     suf = e.get("suffix", "")
+                    typ = e.get("type", "")
                     line = f'{l}; "{p}"'
-                    if pre: line += f'; "{pre}"'
-                    if suf: line += f'; "{suf}"'
+                    if pre or suf or typ: line += f'; "{pre}"'
+                    if suf or typ: line += f'; "{suf}"'
+                    if typ: line += f'; "{typ}"'
                     text += line + "\n"
         self.config_text.delete("1.0", "end")
         self.config_text.insert("1.0", text)
@@ -586,12 +2140,15 @@ class CleanCore(ctk.CTk):
                 f"## === {name.upper()} ===",
                 f"## Created {datetime.now().strftime('%d.%m.%Y %H:%M')}",
                 '## line; "partial"; "prefix_to_cut"; "suffix_to_cut"',
+                '## optional type: "int" "decimal:,." "date:%d.%m.%Y" "upper" "lower" "trim"',
                 '## Use ## \\n for blank line in extract',
                 ""
             ]
         }
         self._save_configs()
-        self.combo.configure(values=list(self.configs.keys()))
+        self.config_index.add(name, self.configs[name])
+        self.recent_configs.insert(0, name)
+        self._refresh_combo()
         self.combo.set(name)
         self.config_text.delete("1.0", "end")
         self.config_text.insert("1.0", "\n".join(self.configs[name]["raw_lines"]))
@@ -618,6 +2175,8 @@ class CleanCore(ctk.CTk):
 
         # Rename
         self.configs[new_name] = self.configs.pop(old_name)
+        self.config_index.rename(old_name, new_name, self.configs[new_name])
+        self.recent_configs = [new_name if n == old_name else n for n in self.recent_configs]
         self.current_config = new_name
         self._save_configs()
         self._refresh_combo()
@@ -651,8 +2210,12 @@ class CleanCore(ctk.CTk):
     def _confirm_delete(self, name, popup):
         popup.destroy()
         del self.configs[name]
+        self.config_index.remove(name)
+        if name in self.recent_configs:
+            self.recent_configs.remove(name)
         if not self.configs:  # safety
             self.configs["default"] = {"entries": [], "raw_lines": []}
+            self.config_index.add("default", self.configs["default"])
         self._save_configs()
         self._refresh_combo()
         first = list(self.configs.keys())[0]
@@ -661,11 +2224,111 @@ class CleanCore(ctk.CTk):
         self._on_config_change(first)
         dark_messagebox("Deleted", f"Config '{name}' removed")
 
+    def _combo_values(self):
+        """Recently used configs first, topped up with the others (never thousands)"""
+        values = [n for n in self.recent_configs if n in self.configs]
+        for name in self.configs:
+            if len(values) >= self.MAX_COMBO_VALUES:
+                break
+            if name not in values:
+                values.append(name)
+        return values
+
     def _refresh_combo(self):
-        values = list(self.configs.keys())
-        self.combo.configure(values=values)
-        if self.current_config not in values and values:
-            self.current_config = values[0]
+        self.combo.configure(values=self._combo_values())
+        if self.current_config not in self.configs and self.configs:
+            self.current_config = next(iter(self.configs))
+
+    def _open_config_picker(self, event=None):
+        """Type-ahead config search (names + rule text) with a virtualized result list"""
+        ROWS = 14
+        win = ctk.CTkToplevel(self)
+        win.title("CleanCore – Find config")
+        win.geometry(f"480x{ROWS * 30 + 120}+{self.winfo_x() + 80}+{self.winfo_y() + 80}")
+        win.resizable(False, False)
+        win.transient(self)
+        win.grab_set()
+
+        entry = ctk.CTkEntry(win, width=440, font=("Consolas", 15),
+                             placeholder_text="Type to search names + rules…")
+        entry.pack(pady=(15, 5))
+        count_label = ctk.CTkLabel(win, text="", font=("Consolas", 11), text_color="#888888")
+        count_label.pack()
+
+        body = ctk.CTkFrame(win, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=15, pady=(0, 15))
+        rows_frame = ctk.CTkFrame(body, fg_color="transparent")
+        rows_frame.pack(side="left", fill="both", expand=True)
+        state = {"results": [], "top": 0, "sel": 0}
+
+        def render():
+            results, top = state["results"], state["top"]
+            for i, btn in enumerate(buttons):
+                idx = top + i
+                if idx < len(results):
+                    btn.configure(text=results[idx], state="normal",
+                                  fg_color="#1f538d" if idx == state["sel"] else "transparent")
+                else:
+                    btn.configure(text="", state="disabled", fg_color="transparent")
+            total = max(1, len(results))
+            scrollbar.set(top / total, min(1.0, (top + ROWS) / total))
+            count_label.configure(text=f"{len(results)} / {len(self.configs)} configs")
+
+        def scroll_to(top):
+            state["top"] = max(0, min(top, len(state["results"]) - ROWS))
+            render()
+
+        def on_scrollbar(*args):
+            if args[0] == "moveto":
+                scroll_to(int(float(args[1]) * len(state["results"])))
+            elif args[0] == "scroll":
+                step = ROWS if args[2] == "pages" else 1
+                scroll_to(state["top"] + int(args[1]) * step)
+
+        def move(delta):
+            if not state["results"]:
+                return
+            sel = max(0, min(state["sel"] + delta, len(state["results"]) - 1))
+            state["sel"] = sel
+            if sel < state["top"]:
+                scroll_to(sel)
+            elif sel >= state["top"] + ROWS:
+                scroll_to(sel - ROWS + 1)
+            else:
+                render()
+
+        def refilter():
+            state.update(results=self.config_index.search(entry.get()), top=0, sel=0)
+            render()
+
+        def pick(idx):
+            if idx >= len(state["results"]):
+                return
+            name = state["results"][idx]
+            win.destroy()
+            self.combo.set(name)
+            self._on_config_change(name)
+
+        buttons = [ctk.CTkButton(rows_frame, text="", anchor="w", height=26, fg_color="transparent",
+                                 hover_color="#3a3a3a", font=("Consolas", 13),
+                                 command=lambda i=i: pick(state["top"] + i)) for i in range(ROWS)]
+        for btn in buttons:
+            btn.pack(fill="x", pady=1)
+        scrollbar = ctk.CTkScrollbar(body, command=on_scrollbar)
+        scrollbar.pack(side="right", fill="y")
+
+        entry.bind("<KeyRelease>", lambda e: e.keysym in ("Up", "Down", "Return", "Escape")
+                   or self.scheduler.schedule(win, "filter", refilter))
+        win.bind("<Up>", lambda e: move(-1))
+        win.bind("<Down>", lambda e: move(+1))
+        win.bind("<Return>", lambda e: pick(state["sel"]))
+        win.bind("<Escape>", lambda e: win.destroy())
+        win.bind("<MouseWheel>", lambda e: scroll_to(state["top"] + (-3 if e.delta > 0 else 3)))
+        win.bind("<Button-4>", lambda e: scroll_to(state["top"] - 3))
+        win.bind("<Button-5>", lambda e: scroll_to(state["top"] + 3))
+
+        refilter()
+        entry.focus_force()
 
     def _save_current_config(self, silent=False):
         raw_lines = self.config_text.get("1.0", "end-1c").splitlines()
@@ -674,16 +2337,18 @@ class CleanCore(ctk.CTk):
             s = raw.strip()
             if not s or s.startswith("#"):
                 continue
-            m = re.match(r'^\s*(\d+)\s*;\s*"([^"]*)"(?:\s*;\s*"([^"]*)")?(?:\s*;\s*"([^"]*)")?\s*$', s)
+            m = RULE_PATTERN.match(s)
             if m:
                 entries.append({
                     "line": int(m.group(1)),
                     "partial": m.group(2),
                     "prefix": (m.group(3) or "").strip(),
                     "suffix": (m.group(4) or "").strip(),
+                    "type": (m.group(5) or "").strip(),
                     "raw": raw
                 })
         self.configs[self.current_config] = {"entries": entries, "raw_lines": raw_lines}
+        self.config_index.add(self.current_config, self.configs[self.current_config])
         self._save_configs()
         if not silent:
             dark_messagebox("CleanCore", f"Config '{self.current_config}' saved!")
@@ -694,42 +2359,41 @@ class CleanCore(ctk.CTk):
 
     def _execute(self):
         self.text_area.text._textbox.tag_remove("bold", "1.0", "end")
-        dump_lines = self.text_area.get("1.0", "end-1c").splitlines()
-        entries = []
+        dump_lines = self.text_area.doc
         cfg = self.configs.get(self.current_config, {})
-        raw_entries = cfg.get("entries", []) if isinstance(cfg, dict) else cfg
 
-        for entry in raw_entries:
-            if isinstance(entry, str):
-                m = re.match(r'^\s*(\d+)\s*;\s*"([^"]*)"(?:\s*;\s*"([^"]*)")?(?:\s*;\s*"([^"]*)")?\s*$', entry.strip())
-                if not m: continue
-                ln, p, pre, suf = int(m.group(1)), m.group(2), (m.group(3) or "").strip(), (m.group(4) or "").strip()
-            else:
-                ln = entry.get("line", 1)
-                p = entry.get("partial", "")
-                pre = entry.get("prefix", "")
-                suf = entry.get("suffix", "")
-            if not p: continue
-            entries.append((ln, p, pre, suf))
-
-        for line_num, partial, prefix, suffix in entries:
-            if line_num > len(dump_lines): continue
-            line = dump_lines[line_num - 1]
-            segments = [s.strip() for s in re.split(r'\s{2,}', line) if s.strip()]
-            for seg in segments:
-                if partial not in seg: continue
-                cleaned = seg
-                offset = 0
-                if prefix and seg.startswith(prefix):
-                    cleaned = cleaned[len(prefix):]
-                    offset = len(prefix)
-                if suffix and cleaned.endswith(suffix):
-                    cleaned = cleaned[:-len(suffix)]
-                if not cleaned: continue
-                start = line.find(seg)
-                self.text_area.text._textbox.tag_add("bold",
-                    f"{line_num}.{start + offset}", f"{line_num}.{start + offset + len(cleaned)}")
-                break
+        hits, telemetry = run_rules(dump_lines, config_rules(cfg))
+        for rule, hit in hits:
+            if not hit: continue
+            line_num = rule[0]
+            col, cleaned, _ = hit
+            self.text_area.text._textbox.tag_add("bold",
+                f"{line_num}.{col}", f"{line_num}.{col + len(cleaned)}")
+        self._record_stats(telemetry)
+
+    def _record_stats(self, telemetry, config_name=None):
+        """One telemetry run of a config (default: current) → rule_stats.bin (EXECUTE / AUTO / FILE)"""
+        try:
+            append_rule_stats(config_name or self.current_config, telemetry)
+        except Exception as e:
+            print(f"[CleanCore] Erro ao gravar stats: {e}")
+
+    def _auto_select_config(self):
+        """Score ALL configs against the current dump → select + execute the winner"""
+        dump_lines = self.text_area.doc
+        ranking = [r for r in score_configs(self.configs, dump_lines) if r[1]]
+        if not ranking:
+            dark_messagebox("CleanCore", "No config matches this dump")
+            return
+
+        best = ranking[0][0]
+        self.combo.set(best)
+        self._on_config_change(best)
+        self._execute()  # records the winner's telemetry; losers are not logged (wrong dump type ≠ drift)
+
+        top = "\n".join(f"{i}. {name} → {hits}/{total} rules"
+                        for i, (name, hits, total) in enumerate(ranking[:10], 1))
+        dark_messagebox("CleanCore • AUTO", f"Selected '{best}'\n\n{top}")
 
     def _extract(self):
         """Extract EXACTLY one value per config line (first match only) — NO TUPLE ERRORS"""
@@ -738,12 +2402,14 @@ class CleanCore(ctk.CTk):
 
         # Collect all bold ranges with position info
         bold_ranges = []
+        doc = self.text_area.doc
         ranges = self.text_area.text._textbox.tag_ranges("bold")
         for i in range(0, len(ranges), 2):
             start = ranges[i]
             end = ranges[i + 1]
-            line_num = int(str(start).split('.')[0])
-            text = self.text_area.text._textbox.get(start, end).strip()
+            line_num, start_col = map(int, str(start).split('.'))
+            end_line, end_col = map(int, str(end).split('.'))
+            text = doc.slice(doc.offset(line_num, start_col), doc.offset(end_line, end_col)).strip()
             if text:
                 bold_ranges.append((line_num, text, str(start), str(end)))  # str() makes it hashable
 
@@ -790,6 +2456,93 @@ class CleanCore(ctk.CTk):
         else:
             dark_messagebox("CleanCore", "No bold text found")
 
+    def _open_dump_file(self):
+        """Load a dump file (plain or compressed) into the dump pane via the bulk path"""
+        path = filedialog.askopenfilename(title="CleanCore – Open dump",
+                                          filetypes=[("Dumps", "*.txt *.log *.gz *.bz2 *.xz"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            self.text_area.load_text(read_dump_text(path))
+        except Exception as e:
+            dark_messagebox("Error", f"Cannot read file:\n{e}")
+
+    def _extract_file(self):
+        """Run the current config over every record of a big dump file → TSV (1 row per record)"""
+        path = filedialog.askopenfilename(title="CleanCore – Dump file")
+        if not path:
+            return
+        with open_dump(path) as f:
+            first = f.readline().decode("utf-8", errors="replace").strip()
+        marker = clean_input_dialog("CleanCore – Records", "Each record starts with line:", first)
+        if marker is None:
+            return
+
+        self._save_current_config(silent=True)
+        config_name = self.current_config
+        cfg = self.configs.get(config_name, {})
+        rules, types = config_rules(cfg), config_types(cfg)
+        if not rules:
+            dark_messagebox("CleanCore", "Config has no rules")
+            return
+
+        # Heavy lifting in a thread (workers run in their own processes) → UI stays alive
+        result = {}
+        def work():
+            try:
+                rows = extract_records(path, rules, marker.strip())
+                result["count"] = len(rows)
+                result["columns"] = records_to_columns(rows, rules, types)
+                # telemetry of the first record, the same run EXECUTE would log for it
+                with open_dump(path) as stream:
+                    first = next(iter_stream_records(stream, marker.strip().encode("utf-8"),
+                                                     max(r[0] for r in rules)), [])
+                result["telemetry"] = run_rules(first, rules)[1]
+            except Exception as e:
+                result["error"] = e
+        worker = threading.Thread(target=work, daemon=True)
+        worker.start()
+
+        def poll():
+            if worker.is_alive():
+                self.after(100, poll)
+                return
+            if "error" in result:
+                dark_messagebox("Error", f"Extraction failed:\n{result['error']}")
+                return
+            self._record_stats(result["telemetry"], config_name)
+            columns = result["columns"]
+            out = filedialog.asksaveasfilename(title="CleanCore – Save result", defaultextension=".tsv",
+                                               filetypes=[("Tab separated", "*.tsv"), ("NumPy columns", "*.npz"),
+                                                          ("All files", "*.*")])
+            if not out:
+                return
+            if out.lower().endswith(".npz"):
+                try:
+                    import numpy as np
+                except ImportError:
+                    dark_messagebox("Error", "Falta o NumPy!\n\npip install numpy")
+                    return
+                np.savez(out, **{name: np.asarray(col) for name, col in columns.items()})
+            else:
+                texts = [column_text(col) for col in columns.values()]
+                with open(out, "w", encoding="utf-8") as f:
+                    for row in zip(*texts):
+                        f.write("\t".join(v.replace("\t", " ") for v in row) + "\n")
+            dark_messagebox("CleanCore", f"{result['count']} records extracted\n→ {os.path.basename(out)}")
+        poll()
+
+    def _show_rule_stats(self):
+        """Rules whose hit rate dropped (format drift) + dead rules, worst first"""
+        report = rule_health(self.configs, load_rule_stats())
+        if not report:
+            dark_messagebox("CleanCore • STATS", "All rules healthy\n(or not enough runs yet)")
+            return
+        lines = [f"{name} • {rule[0]}; \"{rule[1]}\" → {note}" for _, name, rule, note in report[:20]]
+        if len(report) > 20:
+            lines.append(f"... +{len(report) - 20} more")
+        dark_messagebox("CleanCore • STATS", "\n".join(lines))
+
     def _show_help_images(self):
         win = ctk.CTkToplevel(self)
         win.title("CleanCore • Tutorial – @Dpereira88")
@@ -941,5 +2694,7 @@ class CleanCore(ctk.CTk):
             return f"sig_{self.winfo_screenwidth()}x{self.winfo_screenheight()}"     
         
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # .exe workers (PyInstaller)
     app = CleanCore()
     app.mainloop()
\ No newline at end of file
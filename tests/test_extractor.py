@@ -0,0 +1,37 @@
+"""compile_extractor() must return exactly what extract_record() returns."""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from CleanCore import compile_extractor, extract_record  # noqa: E402
+
+LINES = ["HEADER  Invoice 2024", "Nr: 123  Date: 01.02.2024  EUR 10,50",
+         "Nr: 456    Total: 99 EUR", "", "   ", "x"]
+WORDS = ["Nr:", "12", "EUR", "Total:", "a", "ab", "x y", "€"]
+
+
+def _random_case(seed):
+    rnd = random.Random(seed)
+    dump = ["  ".join(rnd.choice(WORDS) for _ in range(rnd.randint(0, 4))) for _ in range(rnd.randint(0, 6))]
+    rules = [(rnd.randint(-1, 8), rnd.choice(WORDS[:6]), rnd.choice(["", "Nr:", "a"]), rnd.choice(["", "2", "b"]))
+             for _ in range(rnd.randint(1, 6))]
+    return dump, rules
+
+
+@pytest.mark.parametrize("rules", [
+    [(2, "Nr", "Nr: ", ""), (3, "Total", "Total: ", " EUR"), (2, "EUR", "EUR ", "")],    # prefix / suffix
+    [(0, "HEADER", "", ""), (-1, "x", "", ""), (7, "x", "", ""), (99, "a", "", "")],     # line 0 / past the end
+    [(2, "Nr", "", ""), (2, "Date", "Date: ", ""), (2, "Nr", "Nr: ", ""), (2, "zz", "", "")],  # repeated line
+    [(1, "HEADER", "HEADER", ""), (6, "x", "x", ""), (3, "EUR", "", "EUR"), (4, "", "", "")],  # cleaned to ""
+], ids=["prefix-suffix", "out-of-range", "repeated-line", "empty-after-clean"])
+def test_fixed_cases(rules):
+    assert compile_extractor(tuple(rules))(LINES) == extract_record(LINES, rules)
+
+
+@pytest.mark.parametrize("seed", range(500))
+def test_random_cases(seed):
+    dump, rules = _random_case(seed)
+    assert compile_extractor(tuple(rules))(dump) == extract_record(dump, rules), (dump, rules)